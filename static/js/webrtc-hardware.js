@@ -185,14 +185,15 @@ function initSpeechRecognition() {
         
         // Always process command, with or without wake word
         if (event.results[event.results.length - 1].isFinal) {
-            // First check if it has wake word
-            if (lowerTranscript.includes(WAKE_WORD)) {
+            // First check if it has wake word (single scan, reused for extraction)
+            const wakeWordIndex = lowerTranscript.indexOf(WAKE_WORD);
+            if (wakeWordIndex !== -1) {
                 wakeWordDetected = true;
                 playActivationSound();
                 document.getElementById('voiceStatus').textContent = 'Wake word detected! Processing command...';
                 
                 // Extract command after wake word if it exists
-                const command = extractCommandAfterWakeWord(lowerTranscript);
+                const command = extractCommandAfterWakeWord(lowerTranscript, wakeWordIndex);
                 if (command && command.length > 1) {
                     processCommand(command);
                 }
@@ -224,9 +225,9 @@ function initSpeechRecognition() {
 
 /**
  * Extract command after wake word from transcript
+ * Pass wakeWordIndex when the caller has already located the wake word.
  */
-function extractCommandAfterWakeWord(text) {
-    const wakeWordIndex = text.indexOf(WAKE_WORD);
+function extractCommandAfterWakeWord(text, wakeWordIndex = text.indexOf(WAKE_WORD)) {
     if (wakeWordIndex !== -1) {
         return text.substring(wakeWordIndex + WAKE_WORD.length).trim();
     }
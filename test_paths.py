@@ -4,17 +4,135 @@ Quick test script for OMIFI storage paths.
 This validates that storage directories are created and accessible.
 """
 
+import io
 import os
 import json
-import time
 from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("omifi-test")
 
+# Clipboard file type by extension; anything else is treated as text
+EXT_TO_TYPE = {
+    ".json": "json",
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".gif": "image"
+}
+
+def dump_json(data):
+    """Serialize data to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+def load_json(path):
+    """Load a JSON file, using orjson when available."""
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def encode_png(size, color):
+    """Encode a solid-color RGB image to PNG bytes."""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def initialize_base_dir(base_dir, timestamp, screenshot_png, clipboard_png):
+    """Initialize a single base directory with sample files."""
+    try:
+        logger.info(f"Testing directory: {base_dir}")
+        
+        # Create base dir and subdirectories
+        os.makedirs(base_dir, exist_ok=True)
+        screenshots_dir = os.path.join(base_dir, "screenshots")
+        clipboard_dir = os.path.join(base_dir, "clipboard")
+        os.makedirs(screenshots_dir, exist_ok=True)
+        os.makedirs(clipboard_dir, exist_ok=True)
+        
+        # Create a test file to verify write permissions
+        test_file = os.path.join(base_dir, "test_file.txt")
+        Path(test_file).write_text(f"Test file created at {timestamp}")
+        logger.info(f"  Created test file: {test_file}")
+        
+        # Create a test screenshot
+        screenshot_file = os.path.join(screenshots_dir, f"test_screenshot_{timestamp}.png")
+        Path(screenshot_file).write_bytes(screenshot_png)
+        logger.info(f"  Created test screenshot: {screenshot_file}")
+        
+        # Create a test clipboard text file
+        clipboard_text_file = os.path.join(clipboard_dir, f"test_clipboard_text_{timestamp}.txt")
+        Path(clipboard_text_file).write_text(f"This is a test clipboard text entry created at {timestamp}")
+        logger.info(f"  Created test clipboard text: {clipboard_text_file}")
+        
+        # Create a test JSON file
+        clipboard_json_file = os.path.join(clipboard_dir, f"test_clipboard_json_{timestamp}.json")
+        test_data = {
+            "test": True,
+            "timestamp": timestamp,
+            "data": {
+                "name": "OMIFI Test Data",
+                "value": 42,
+                "tags": ["test", "json", "clipboard"]
+            }
+        }
+        Path(clipboard_json_file).write_text(json.dumps(test_data, indent=2))
+        logger.info(f"  Created test clipboard JSON: {clipboard_json_file}")
+        
+        # Create a test clipboard image 
+        clipboard_image_file = os.path.join(clipboard_dir, f"test_clipboard_image_{timestamp}.png")
+        Path(clipboard_image_file).write_bytes(clipboard_png)
+        logger.info(f"  Created test clipboard image: {clipboard_image_file}")
+        
+        # Build the new metadata entries in memory
+        screenshot_filename = os.path.basename(screenshot_file)
+        screenshot_entries = [{
+            "timestamp": timestamp,
+            "filename": screenshot_filename,
+            "filepath": screenshot_filename
+        }]
+        
+        clipboard_filenames = [
+            os.path.basename(file_path)
+            for file_path in (clipboard_text_file, clipboard_json_file, clipboard_image_file)
+        ]
+        clipboard_entries = [{
+            "timestamp": timestamp,
+            "filename": filename,
+            "filepath": filename,
+            "type": EXT_TO_TYPE.get(os.path.splitext(filename)[1].lower(), "text")
+        } for filename in clipboard_filenames]
+        
+        # Merge with existing metadata: a single read, no separate exists() check
+        metadata_file = os.path.join(base_dir, "metadata.json")
+        try:
+            metadata = load_json(metadata_file)
+        except (json.JSONDecodeError, IOError):
+            metadata = {}
+        metadata.setdefault("screenshots", []).extend(screenshot_entries)
+        metadata.setdefault("clipboard", []).extend(clipboard_entries)
+        
+        # Save updated metadata
+        Path(metadata_file).write_bytes(dump_json(metadata))
+        logger.info(f"  Updated metadata: {metadata_file}")
+        
+        logger.info(f"✅ Successfully initialized {base_dir}")
+        
+    except Exception as e:
+        logger.error(f"❌ Error initializing {base_dir}: {e}")
+
 def initialize_storage():
     """Initialize test storage directories and sample files."""
     # Create multiple base directories for better compatibility
@@ -27,100 +145,20 @@ def initialize_storage():
     
     timestamp = datetime.now().isoformat().replace(':', '-')
     
-    for base_dir in base_dirs:
-        try:
-            logger.info(f"Testing directory: {base_dir}")
-            
-            # Create base dir and subdirectories
-            os.makedirs(base_dir, exist_ok=True)
-            screenshots_dir = os.path.join(base_dir, "screenshots")
-            clipboard_dir = os.path.join(base_dir, "clipboard")
-            os.makedirs(screenshots_dir, exist_ok=True)
-            os.makedirs(clipboard_dir, exist_ok=True)
-            
-            # Create a test file to verify write permissions
-            test_file = os.path.join(base_dir, "test_file.txt")
-            with open(test_file, 'w') as f:
-                f.write(f"Test file created at {timestamp}")
-            logger.info(f"  Created test file: {test_file}")
-            
-            # Create a test screenshot
-            screenshot_file = os.path.join(screenshots_dir, f"test_screenshot_{timestamp}.png")
-            img = Image.new('RGB', (400, 300), color=(30, 60, 90))
-            img.save(screenshot_file)
-            logger.info(f"  Created test screenshot: {screenshot_file}")
-            
-            # Create a test clipboard text file
-            clipboard_text_file = os.path.join(clipboard_dir, f"test_clipboard_text_{timestamp}.txt")
-            with open(clipboard_text_file, 'w') as f:
-                f.write(f"This is a test clipboard text entry created at {timestamp}")
-            logger.info(f"  Created test clipboard text: {clipboard_text_file}")
-            
-            # Create a test JSON file
-            clipboard_json_file = os.path.join(clipboard_dir, f"test_clipboard_json_{timestamp}.json")
-            test_data = {
-                "test": True,
-                "timestamp": timestamp,
-                "data": {
-                    "name": "OMIFI Test Data",
-                    "value": 42,
-                    "tags": ["test", "json", "clipboard"]
-                }
-            }
-            with open(clipboard_json_file, 'w') as f:
-                json.dump(test_data, f, indent=2)
-            logger.info(f"  Created test clipboard JSON: {clipboard_json_file}")
-            
-            # Create a test clipboard image 
-            clipboard_image_file = os.path.join(clipboard_dir, f"test_clipboard_image_{timestamp}.png")
-            img = Image.new('RGB', (200, 150), color=(120, 40, 80))
-            img.save(clipboard_image_file)
-            logger.info(f"  Created test clipboard image: {clipboard_image_file}")
-            
-            # Create/update metadata file
-            metadata_file = os.path.join(base_dir, "metadata.json")
-            metadata = {}
-            if os.path.exists(metadata_file):
-                try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                except (json.JSONDecodeError, IOError):
-                    metadata = {"screenshots": [], "clipboard": []}
-            else:
-                metadata = {"screenshots": [], "clipboard": []}
-            
-            # Add test entries to metadata
-            screenshot_filename = os.path.basename(screenshot_file)
-            metadata["screenshots"].append({
-                "timestamp": timestamp,
-                "filename": screenshot_filename,
-                "filepath": screenshot_filename
-            })
-            
-            for file_path in [clipboard_text_file, clipboard_json_file, clipboard_image_file]:
-                filename = os.path.basename(file_path)
-                file_type = "text"
-                if file_path.endswith(".json"):
-                    file_type = "json"
-                elif file_path.endswith((".png", ".jpg", ".jpeg", ".gif")):
-                    file_type = "image"
-                
-                metadata["clipboard"].append({
-                    "timestamp": timestamp,
-                    "filename": filename,
-                    "filepath": filename,
-                    "type": file_type
-                })
-            
-            # Save updated metadata
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
-            logger.info(f"  Updated metadata: {metadata_file}")
-            
-            logger.info(f"✅ Successfully initialized {base_dir}")
-            
-        except Exception as e:
-            logger.error(f"❌ Error initializing {base_dir}: {e}")
+    # The sample images are identical for every directory, so encode them once
+    screenshot_png = encode_png((400, 300), (30, 60, 90))
+    clipboard_png = encode_png((200, 150), (120, 40, 80))
+    
+    # Directories are independent, so initialize them concurrently.
+    # Drop duplicates (e.g. when run from ~) so no two workers share a directory.
+    base_dirs = list(dict.fromkeys(os.path.abspath(d) for d in base_dirs))
+    with ThreadPoolExecutor(max_workers=len(base_dirs)) as executor:
+        list(executor.map(lambda base_dir: initialize_base_dir(base_dir, timestamp, screenshot_png, clipboard_png), base_dirs))
+
+def count_entries(path):
+    """Count directory entries without building a list of names."""
+    with os.scandir(path) as entries:
+        return sum(1 for _ in entries)
 
 def check_files():
     """Check that files exist in the expected locations."""
@@ -147,22 +185,19 @@ def check_files():
         # Check metadata file
         if os.path.exists(metadata_file):
             try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = load_json(metadata_file)
                 logger.info(f"  Metadata available: {len(metadata.get('screenshots', []))} screenshots, {len(metadata.get('clipboard', []))} clipboard items")
                 success = True
                 
                 # Check screenshots
                 if os.path.exists(screenshots_dir):
-                    screenshots = os.listdir(screenshots_dir)
-                    logger.info(f"  Screenshots directory contains {len(screenshots)} files")
+                    logger.info(f"  Screenshots directory contains {count_entries(screenshots_dir)} files")
                 else:
                     logger.warning(f"  Screenshots directory missing: {screenshots_dir}")
                 
                 # Check clipboard
                 if os.path.exists(clipboard_dir):
-                    clipboard_files = os.listdir(clipboard_dir)
-                    logger.info(f"  Clipboard directory contains {len(clipboard_files)} files")
+                    logger.info(f"  Clipboard directory contains {count_entries(clipboard_dir)} files")
                 else:
                     logger.warning(f"  Clipboard directory missing: {clipboard_dir}")
                 
@@ -179,7 +214,6 @@ if __name__ == "__main__":
     logger.info("Current working directory: " + os.getcwd())
     
     initialize_storage()
-    time.sleep(1)  # Wait for file operations to complete
     
     logger.info("\nChecking files:")
     success = check_files()